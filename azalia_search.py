@@ -9,14 +9,23 @@ Azalia SMM/Media Job Search Script
 - Optimized for comprehensive monitoring and daily job checks
 """
 
-import sys
-import os
 import argparse
+import hashlib
 import json
+import os
+import sys
 import tempfile
-import subprocess
+import time
 from datetime import datetime
 
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from craigslist_jobs.seen import load_seen, save_seen, url_fingerprint
+from craigslist_jobs.utils import atomic_write
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -61,13 +70,18 @@ def parse_args():
         "--output",
         "-o",
         type=str,
-        default="daily_smm_jobs.json",
-        help="Output JSON file name (default: daily_smm_jobs.json)",
+        default="daily_smm_jobs.jsonl",
+        help="Output file name (default: daily_smm_jobs.jsonl)",
     )
     parser.add_argument(
         "--csv",
         action="store_true",
-        help="Output in CSV format instead of JSON",
+        help="Output in CSV format instead of JSON Lines",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Output an indented JSON array instead of JSON Lines",
     )
     parser.add_argument(
         "--quiet",
@@ -75,6 +89,17 @@ def parse_args():
         action="store_true",
         help="Minimal output - only show final results count",
     )
+    parser.add_argument(
+        "--title-prefilter",
+        action="store_true",
+        help="Only fetch listings whose title contains a keyword (faster, may miss description-only matches; on in monitor mode)",
+    )
+    parser.add_argument(
+        "--seen-db",
+        type=str,
+        default=None,
+        help="File remembering jobs from previous runs; jobs already in it are skipped (default: monitor_seen.db in monitor mode)",
+    )
     parser.add_argument(
         "--monitor",
         action="store_true",
@@ -83,89 +108,169 @@ def parse_args():
     return parser.parse_args()
 
 
-def run_spider_for_section(section, keywords, days, locations, max_jobs, quiet=False):
-    """Run spider for a specific section and return results"""
-    import shlex
-    import uuid
+def split_csv(value):
+    """Split a comma-separated CLI value into a tuple of lowercased terms"""
+    return tuple(item.strip().lower() for item in value.split(",") if item.strip())
 
-    temp_results_path = os.path.join(
-        tempfile.gettempdir(), f"smm_search_{section}_{uuid.uuid4().hex}.json"
-    )
 
-    spider_cmd = [
-        "uv"
-        if os.path.exists("uv.lock") or os.path.exists("pyproject.toml")
-        else sys.executable,
-    ]
-    if spider_cmd[0] == "uv":
-        spider_cmd += [
-            "run",
-            "scrapy",
-            "crawl",
-            "chicago_jobs",
-            "-O",
-            temp_results_path,
-            "-a",
-            f"section={section}",
-            "-a",
-            f"days={days}",
-            "-a",
-            f"keywords={keywords}",
-            "-a",
-            f"locations={locations}",
-            "-a",
-            f"max_jobs={max_jobs}",
-        ]
-    else:
-        spider_cmd += [
-            "-m",
-            "scrapy",
-            "crawl",
-            "chicago_jobs",
-            "-O",
-            temp_results_path,
-            "-a",
-            f"section={section}",
-            "-a",
-            f"days={days}",
-            "-a",
-            f"keywords={keywords}",
-            "-a",
-            f"locations={locations}",
-            "-a",
-            f"max_jobs={max_jobs}",
-        ]
+# Reuse a section's results for as long as its pages stay in the HTTP cache
+RESULT_CACHE_TTL = 3600
+
+
+def result_cache_path(section, *search_params):
+    """Path of the cached results for one section and set of search parameters"""
+    key = hashlib.blake2b(
+        repr((section, *search_params)).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"smm_cache_{key}.json")
 
-    if not quiet:
-        print(f"[SMM Search] Scanning section '{section}'...")
 
+def load_cached_results(cache_path):
+    """Return cached section results if still fresh, otherwise None"""
     try:
-        result = subprocess.run(
-            spider_cmd,
-            check=True,
-            capture_output=True,
-            text=True,
-            cwd="craigslist_jobs",
+        if time.time() - os.path.getmtime(cache_path) >= RESULT_CACHE_TTL:
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_results(cache_path, jobs):
+    """Write section results to the cache, replacing the file atomically"""
+    data = json.dumps(jobs, ensure_ascii=False)
+    atomic_write(cache_path, "w", lambda f: f.write(data), encoding="utf-8")
+
+
+class SectionCollector:
+    """
+    Collect one section's jobs into a shared dict keyed by job_url
+    fingerprint, keeping the first job seen for each URL as they stream in.
+    """
+
+    def __init__(self, section, sink, fields, cache_path=None, quiet=False):
+        self.section = section
+        self.sink = sink
+        self.fields = fields
+        self.cache_path = cache_path
+        self.quiet = quiet
+        self.jobs = []
+
+    def add(self, job):
+        self.jobs.append(job)
+        url = job.get("job_url")
+        # Jobs without a URL can't be duplicates of each other, keep them all
+        self.sink.setdefault(url_fingerprint(url) if url else id(job), job)
+
+    def item_scraped(self, item, spider):
+        # Same columns as the feed exports (FEED_EXPORT_FIELDS)
+        adapter = ItemAdapter(item)
+        self.add({field: adapter.get(field) for field in self.fields})
+
+    @staticmethod
+    def crawl_was_clean(spider):
+        """
+        True unless the crawl lost results. Blocked pages, requests that ran
+        out of retries and failed listing pages still end as "finished".
+        Errors that were retried successfully, or a single missing posting,
+        don't count.
+        """
+        stats = spider.crawler.stats
+        return not (
+            stats.get_value("craigslist_jobs/blocked", 0)
+            or stats.get_value("craigslist_jobs/listing_failed", 0)
+            or stats.get_value("retry/max_reached", 0)
         )
-    except subprocess.CalledProcessError as e:
-        if not quiet:
-            print(f"[SMM Search] Section '{section}' failed: {e.stderr[:100]}...")
-        return []
 
-    try:
-        with open(temp_results_path, "r", encoding="utf-8") as f:
-            jobs = json.load(f)
+    def spider_closed(self, spider, reason):
+        # Only complete results are cached, so a blocked section is retried
+        if reason == "finished" and self.cache_path and self.crawl_was_clean(spider):
+            save_cached_results(self.cache_path, self.jobs)
+        if self.quiet:
+            return
+        if reason == "finished":
+            print(f"[SMM Search] Section '{self.section}': {len(self.jobs)} jobs")
+        else:
+            print(f"[SMM Search] Section '{self.section}' failed: {reason}")
+
+
+def run_spiders(
+    sections,
+    keywords,
+    days,
+    locations,
+    max_jobs,
+    seen_db=None,
+    title_prefilter=False,
+    quiet=False,
+):
+    """
+    Crawl all sections concurrently in one Scrapy process and return unique jobs.
+    Sections with fresh cached results for the same parameters are not crawled.
+    """
+    settings = get_project_settings()
+    settings.set("LOG_LEVEL", "ERROR" if quiet else "WARNING")
+    fields = settings.getlist("FEED_EXPORT_FIELDS")
+
+    jobs_by_url = {}
+    pending = []
+    for section in sections:
+        # The spider skips jobs from seen_db, so it is part of the key as well
+        cache_path = result_cache_path(
+            section,
+            keywords,
+            days,
+            locations,
+            max_jobs,
+            title_prefilter,
+            os.path.abspath(seen_db) if seen_db else None,
+        )
+        collector = SectionCollector(section, jobs_by_url, fields, cache_path, quiet)
+
+        cached_jobs = load_cached_results(cache_path)
+        if cached_jobs is not None:
+            for job in cached_jobs:
+                collector.add(job)
             if not quiet:
-                print(f"[SMM Search] Section '{section}': {len(jobs)} jobs")
-            return jobs
-    except Exception as e:
+                print(
+                    f"[SMM Search] Section '{section}': {len(cached_jobs)} jobs (cached)"
+                )
+        else:
+            pending.append(collector)
+
+    if not pending:
+        return list(jobs_by_url.values())
+
+    # Every crawler has its own downloader, so split the per-domain slots
+    # between them to keep the whole run within CONCURRENT_REQUESTS_PER_DOMAIN
+    per_domain = max(
+        1, settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN") // len(pending)
+    )
+    settings.set("CONCURRENT_REQUESTS_PER_DOMAIN", per_domain)
+
+    process = CrawlerProcess(settings)
+    # Signal handlers are held by weak reference; pending keeps collectors alive
+    for collector in pending:
         if not quiet:
-            print(f"[SMM Search] Failed to load results for section '{section}': {e}")
-        return []
-    finally:
-        # Clean up temp file
-        if os.path.exists(temp_results_path):
-            os.remove(temp_results_path)
+            print(f"[SMM Search] Scanning section '{collector.section}'...")
+
+        crawler = process.create_crawler("chicago_jobs")
+        crawler.signals.connect(collector.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(collector.spider_closed, signal=signals.spider_closed)
+        process.crawl(
+            crawler,
+            section=collector.section,
+            days=days,
+            keywords=keywords,
+            locations=locations,
+            max_jobs=max_jobs,
+            seen_db=seen_db,
+            title_prefilter=title_prefilter,
+        )
+
+    process.start()
+    return list(jobs_by_url.values())
 
 
 def main():
@@ -178,81 +283,117 @@ def main():
         args.sections = "crg,cpg"  # Most active sections for part-time
         args.locations = "chicago"
         args.quiet = True
-        if args.output == "daily_smm_jobs.json":
-            args.output = "monitor_jobs.json"
+        if args.output == "daily_smm_jobs.jsonl":
+            args.output = "monitor_jobs.jsonl"
+        if args.seen_db is None:
+            args.seen_db = "monitor_seen.db"
+        args.title_prefilter = True
 
-    sections = [s.strip() for s in args.sections.split(",") if s.strip()]
-    all_jobs = []
+    # Unique sections, in order: a section crawled twice would open its
+    # HTTP cache database twice
+    sections = list(
+        dict.fromkeys(s.strip() for s in args.sections.split(",") if s.strip())
+    )
 
+    # Banner and summary are joined and written in one call each
     if not args.quiet:
-        print(f"🔍 [SMM Search] Monitoring Chicago SMM/media jobs")
-        print(f"📅 Period: last {args.days} days")
-        print(f"📍 Location: {args.locations}")
-        print(f"🎯 Sections: {', '.join(sections)}")
-        print(f"🔢 Max per section: {args.max_jobs}")
-        print("-" * 50)
+        banner = [
+            "🔍 [SMM Search] Monitoring Chicago SMM/media jobs",
+            f"📅 Period: last {args.days} days",
+            f"📍 Location: {args.locations}",
+            f"🎯 Sections: {', '.join(sections)}",
+            f"🔢 Max per section: {args.max_jobs}",
+            "-" * 50,
+        ]
+        sys.stdout.write("\n".join(banner) + "\n")
 
-    for section in sections:
-        jobs = run_spider_for_section(
-            section, args.keywords, args.days, args.locations, args.max_jobs, args.quiet
-        )
-        all_jobs.extend(jobs)
+    # Jobs are deduplicated by job_url as they are scraped. Keywords and
+    # locations are tokenized once here and handed to every spider as-is.
+    unique_jobs = run_spiders(
+        sections,
+        split_csv(args.keywords),
+        args.days,
+        split_csv(args.locations),
+        args.max_jobs,
+        args.seen_db,
+        args.title_prefilter,
+        args.quiet,
+    )
 
-    # Remove duplicates based on job_url
-    seen_urls = set()
-    unique_jobs = []
-    for job in all_jobs:
-        if job.get("job_url") not in seen_urls:
-            seen_urls.add(job.get("job_url"))
-            unique_jobs.append(job)
+    # Drop jobs reported by previous runs and remember the new ones
+    if args.seen_db:
+        seen = load_seen(args.seen_db)
+        unique_jobs = [
+            job
+            for job in unique_jobs
+            if url_fingerprint(job.get("job_url") or "") not in seen
+        ]
+        seen.update(url_fingerprint(job.get("job_url") or "") for job in unique_jobs)
 
-    # Sort by posted date (newest first)
-    try:
-        unique_jobs.sort(key=lambda x: x.get("posted_date", ""), reverse=True)
-    except:
-        pass  # If sorting fails, keep original order
+    # Sort by posted date (newest first); jobs without a date go last
+    unique_jobs.sort(key=lambda job: job.get("posted_date") or "", reverse=True)
 
     # Determine output format
     output_file = args.output
     if args.csv:
         if not output_file.endswith(".csv"):
-            output_file = output_file.replace(".json", ".csv")
+            output_file = os.path.splitext(output_file)[0] + ".csv"
 
         # Write CSV
         import csv
 
         if unique_jobs:
             with open(output_file, "w", encoding="utf-8", newline="") as csvfile:
-                fieldnames = unique_jobs[0].keys()
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(unique_jobs)
+                fieldnames = list(unique_jobs[0].keys())
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                # Positional rows; missing fields are written as empty cells
+                writer.writerows(
+                    [job.get(field, "") for field in fieldnames] for job in unique_jobs
+                )
+    elif args.pretty:
+        if output_file.endswith(".jsonl"):
+            output_file = output_file[: -len(".jsonl")] + ".json"
+
+        # Write JSON: encode in one go and write once; json.dump would issue
+        # a separate write() for every token of the indented output
+        with open(output_file, "w", encoding="utf-8") as outfile:
+            outfile.write(json.dumps(unique_jobs, ensure_ascii=False, indent=2))
     else:
-        # Write JSON
+        # Write JSON Lines: one compact record per line, so consumers can
+        # read jobs one at a time and only one record is encoded at once
         with open(output_file, "w", encoding="utf-8") as outfile:
-            json.dump(unique_jobs, outfile, ensure_ascii=False, indent=2)
+            outfile.writelines(
+                json.dumps(job, ensure_ascii=False) + "\n" for job in unique_jobs
+            )
+
+    if args.seen_db:
+        save_seen(args.seen_db, seen)
 
     # Summary output
     if args.quiet:
         print(f"{len(unique_jobs)} new jobs found")
     else:
-        print("-" * 50)
-        print(f"✅ [SMM Search] Complete!")
-        print(f"📊 Total unique jobs found: {len(unique_jobs)}")
-        print(f"💾 Results saved to: {output_file}")
+        summary = [
+            "-" * 50,
+            "✅ [SMM Search] Complete!",
+            f"📊 Total unique jobs found: {len(unique_jobs)}",
+            f"💾 Results saved to: {output_file}",
+        ]
 
         if unique_jobs:
-            print(f"\n📋 Latest jobs preview:")
+            summary.append("\n📋 Latest jobs preview:")
             for i, job in enumerate(unique_jobs[:3], 1):
                 title = job.get("title", "N/A")[:50]
                 location = job.get("location", "N/A").strip()
-                print(f"  {i}. {title}... ({location})")
+                summary.append(f"  {i}. {title}... ({location})")
 
             if len(unique_jobs) > 3:
-                print(f"  ... and {len(unique_jobs) - 3} more jobs")
+                summary.append(f"  ... and {len(unique_jobs) - 3} more jobs")
 
-        print(f"\n💡 To see all results: open {output_file}")
-        print(f"🔄 For daily monitoring: python azalia_search.py --monitor")
+        summary.append(f"\n💡 To see all results: open {output_file}")
+        summary.append("🔄 For daily monitoring: python azalia_search.py --monitor")
+        sys.stdout.write("\n".join(summary) + "\n")
 
 
 if __name__ == "__main__":
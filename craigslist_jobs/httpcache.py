@@ -0,0 +1,102 @@
+# HTTP cache storage for the craigslist_jobs project
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-storage
+
+import logging
+from pathlib import Path
+
+from scrapy.extensions.httpcache import DbmCacheStorage
+from scrapy.utils.httpobj import urlparse_cached
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def _try_lock(f):
+    """Take an exclusive lock on an open file; raise OSError if already held"""
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+class SectionDbmCacheStorage(DbmCacheStorage):
+    """
+    Single-file DBM cache, kept in one database per Craigslist section.
+    Every section runs the same spider, and azalia_search.py crawls several
+    sections concurrently in one process, so each gets its own <spider>.db.
+
+    Only dbm.gnu locks its files; dbm.dumb, the fallback when no other backend
+    is built in, does not. Each database is therefore guarded by an exclusive
+    lock on a <spider>.lock file next to it. If another run already holds the
+    lock (e.g. a cron --monitor run crawling the same section) or the database
+    can't be opened, the section is crawled without the cache.
+
+    robots.txt rarely changes, so it is kept for ROBOTSTXT_CACHE_EXPIRATION_SECS
+    instead of HTTPCACHE_EXPIRATION_SECS and isn't refetched on every run.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.robotstxt_expiration_secs = settings.getint(
+            "ROBOTSTXT_CACHE_EXPIRATION_SECS"
+        )
+        self.db = None
+        self.lock_file = None
+
+    def open_spider(self, spider):
+        section = getattr(spider, "section", None)
+        if section:
+            self.cachedir = str(Path(self.cachedir, section))
+            Path(self.cachedir).mkdir(parents=True, exist_ok=True)
+
+        # dbm.error is a tuple of exception classes, dbm.gnu.error a single class
+        dbm_errors = self.dbmodule.error
+        if not isinstance(dbm_errors, tuple):
+            dbm_errors = (dbm_errors,)
+        lock_file = open(Path(self.cachedir, f"{spider.name}.lock"), "a")
+        try:
+            _try_lock(lock_file)
+            super().open_spider(spider)
+        except (*dbm_errors, OSError) as e:
+            lock_file.close()
+            logger.warning(
+                "Can't open HTTP cache in %s, crawling without it: %s",
+                self.cachedir,
+                e,
+                extra={"spider": spider},
+            )
+            self.db = None
+            return
+        self.lock_file = lock_file
+
+    def close_spider(self, spider):
+        if self.db is not None:
+            super().close_spider(spider)
+        if self.lock_file is not None:
+            # Closing the file releases the lock
+            self.lock_file.close()
+            self.lock_file = None
+
+    def store_response(self, spider, request, response):
+        if self.db is not None:
+            super().store_response(spider, request, response)
+
+    def retrieve_response(self, spider, request):
+        if self.db is None:
+            return None
+        if urlparse_cached(request).path != "/robots.txt":
+            return super().retrieve_response(spider, request)
+
+        expiration_secs = self.expiration_secs
+        self.expiration_secs = self.robotstxt_expiration_secs
+        try:
+            return super().retrieve_response(spider, request)
+        finally:
+            self.expiration_secs = expiration_secs
@@ -3,43 +3,47 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+from dataclasses import dataclass
+from typing import Optional
+
 import scrapy
 
 
-class CraigslistJobsItem(scrapy.Item):
+@dataclass(slots=True)
+class CraigslistJobsItem:
     """
     Structured item for Craigslist job data.
     Following GoTrained tutorial recommendations for data organization.
+
+    A slotted dataclass rather than a scrapy.Item: fields are plain slot
+    attributes with no per-instance __dict__ or dict-protocol field checks.
+    Scrapy handles dataclass items natively through ItemAdapter.
     """
 
     # Job basic information
-    title = scrapy.Field()
-    job_url = scrapy.Field()
-    posted_date = scrapy.Field()
-    location = scrapy.Field()
+    title: str = ""
+    job_url: str = ""
+    posted_date: Optional[str] = None
+    location: str = ""
 
     # Job content
-    short_description = scrapy.Field()
-    full_description = scrapy.Field()
+    short_description: str = ""
+    full_description: str = ""
 
     # Additional metadata
-    section = scrapy.Field()  # Which Craigslist section (mar, crg, etc.)
-    scraped_at = scrapy.Field()  # When the item was scraped
+    section: str = ""  # Which Craigslist section (mar, crg, etc.)
+    scraped_at: str = ""  # When the item was scraped
 
     # Contact information (if available)
-    contact_info = scrapy.Field()
+    contact_info: str = ""
 
     # Job requirements/attributes
-    job_type = scrapy.Field()  # full-time, part-time, contract, etc.
-    salary_info = scrapy.Field()
+    job_type: str = ""  # full-time, part-time, contract, etc.
+    salary_info: str = ""
 
     def __str__(self):
         """String representation for debugging"""
-        return f"CraigslistJob(title='{self.get('title', 'N/A')}', location='{self.get('location', 'N/A')}')"
-
-    def __repr__(self):
-        """Detailed representation for debugging"""
-        return f"CraigslistJobsItem({dict(self)})"
+        return f"CraigslistJob(title='{self.title or 'N/A'}', location='{self.location or 'N/A'}')"
 
 
 class JobFilterItem(scrapy.Item):
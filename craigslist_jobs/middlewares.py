@@ -3,7 +3,12 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import time
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -98,3 +103,46 @@ class CraigslistJobsDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class DomainRateLimitMiddleware:
+    """
+    Token bucket enforcing a hard cap of DOMAIN_RATE_LIMIT requests per second
+    per domain, with bursts of up to DOMAIN_RATE_LIMIT_BURST requests.
+    AutoThrottle only adapts to server latency; use this when a fixed ceiling
+    is required. Buckets are shared by all crawlers in the process, so the cap
+    also holds when several sections are crawled concurrently.
+    """
+
+    # domain -> (available tokens, time of last refill)
+    buckets = {}
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        rate = crawler.settings.getfloat("DOMAIN_RATE_LIMIT")
+        if rate <= 0:
+            raise NotConfigured
+        burst = max(crawler.settings.getfloat("DOMAIN_RATE_LIMIT_BURST"), 1.0)
+        return cls(rate, burst)
+
+    def _reserve(self, domain):
+        """Take a token for the domain and return how long to wait until it's due"""
+        now = time.monotonic()
+        tokens, last = self.buckets.get(domain, (self.burst, now))
+        # Tokens may go negative: each waiting request holds a reservation
+        tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+        self.buckets[domain] = (tokens, now)
+        return -tokens / self.rate if tokens < 0 else 0
+
+    async def process_request(self, request, spider):
+        from twisted.internet import reactor
+        from twisted.internet.task import deferLater
+
+        delay = self._reserve(urlparse_cached(request).hostname)
+        if delay > 0:
+            await maybe_deferred_to_future(deferLater(reactor, delay, lambda: None))
+        return None
@@ -0,0 +1,39 @@
+# Compact fingerprints of job URLs, used to recognize jobs that were
+# already seen without keeping the full URL strings around.
+
+import hashlib
+import logging
+from array import array
+
+from craigslist_jobs.utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+def url_fingerprint(url):
+    """
+    Return a stable 64-bit integer fingerprint of a job URL.
+    Unlike the built-in hash(), the value is the same across runs.
+    """
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def load_seen(path):
+    """Load the set of fingerprints persisted by save_seen (empty if missing)"""
+    seen = array("Q")
+    try:
+        with open(path, "rb") as f:
+            seen.frombytes(f.read())
+    except FileNotFoundError:
+        pass
+    except ValueError:
+        # Truncated file: its length is not a multiple of 8 bytes
+        logger.warning("Ignoring malformed seen-jobs file: %s", path)
+        return set()
+    return set(seen)
+
+
+def save_seen(path, seen):
+    """Persist fingerprints as raw 8-byte integers, replacing the file atomically"""
+    atomic_write(path, "wb", array("Q", seen).tofile)
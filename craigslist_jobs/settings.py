@@ -22,21 +22,32 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 ROBOTSTXT_OBEY = True
 
 # Concurrency and throttling settings
-# Reduced to be more respectful to Craigslist servers (GoTrained recommendation)
-CONCURRENT_REQUESTS = 1
-CONCURRENT_REQUESTS_PER_DOMAIN = 1
-DOWNLOAD_DELAY = 2  # Increased from 1 to 2 seconds (GoTrained recommendation)
+# Moderate hard caps; AutoThrottle below finds the actual sustainable rate.
+# azalia_search.py splits the per-domain cap across its section crawlers.
+CONCURRENT_REQUESTS = 16
+CONCURRENT_REQUESTS_PER_DOMAIN = 4
+DOWNLOAD_DELAY = 0  # Minimum delay; AutoThrottle raises it when the server slows down
 RANDOMIZE_DOWNLOAD_DELAY = (
     0.5  # 50% of DOWNLOAD_DELAY to 150% (0.5 * DOWNLOAD_DELAY to 1.5 * DOWNLOAD_DELAY)
 )
 
-# Auto-throttle to be even more respectful
+# Auto-throttle adapts the delay to server latency and backs off on errors
 AUTOTHROTTLE_ENABLED = True
 AUTOTHROTTLE_START_DELAY = 1
-AUTOTHROTTLE_MAX_DELAY = 10
-AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_MAX_DELAY = 30
+AUTOTHROTTLE_TARGET_CONCURRENCY = 2.0
 AUTOTHROTTLE_DEBUG = False  # Set to True to see throttling stats
 
+# Fail fast on stalled connections and DNS lookups instead of holding a
+# concurrency slot for the default 180s/60s
+DOWNLOAD_TIMEOUT = 30
+DNS_TIMEOUT = 5
+
+# Optional hard cap in requests per second per domain (0 disables it),
+# enforced by DomainRateLimitMiddleware on top of AutoThrottle
+DOMAIN_RATE_LIMIT = 0
+DOMAIN_RATE_LIMIT_BURST = 1
+
 # Disable cookies (enabled by default) - often not needed for job scraping
 COOKIES_ENABLED = False
 
@@ -61,9 +72,11 @@ DEFAULT_REQUEST_HEADERS = {
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "craigslist_jobs.middlewares.CraigslistJobsDownloaderMiddleware": 543,
-# }
+DOWNLOADER_MIDDLEWARES = {
+    # "craigslist_jobs.middlewares.CraigslistJobsDownloaderMiddleware": 543,
+    # After HttpCacheMiddleware (900) so cached responses are not rate limited
+    "craigslist_jobs.middlewares.DomainRateLimitMiddleware": 950,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -92,9 +105,22 @@ HTTPCACHE_ENABLED = True
 HTTPCACHE_EXPIRATION_SECS = 3600  # 1 hour cache
 HTTPCACHE_DIR = "httpcache"
 HTTPCACHE_IGNORE_HTTP_CODES = [503, 504, 505, 500, 403, 404, 408, 429]
+# One DBM file per section instead of several small files per cached request
+HTTPCACHE_STORAGE = "craigslist_jobs.httpcache.SectionDbmCacheStorage"
+# Best available backend; the storage adds its own lock file, since only
+# dbm.gnu locks the database itself
+HTTPCACHE_DBM_MODULE = "dbm"
+ROBOTSTXT_CACHE_EXPIRATION_SECS = 86400  # robots.txt is reused for a day
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
 
 # Logging settings
 LOG_LEVEL = "INFO"  # Change to DEBUG for more verbose output
+
+# Save listing pages without job rows to debug_page.html for inspection
+DEBUG_DUMP_HTML = False
+
+# Fall back to scraping the whole page body when a posting has neither
+# #postingbody nor .userbody (slow, and rarely yields a real description)
+FULL_BODY_DESC_FALLBACK = False
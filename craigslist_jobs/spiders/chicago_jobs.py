@@ -2,17 +2,97 @@ import scrapy
 import re
 from datetime import datetime, timedelta
 
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+
+from craigslist_jobs.items import CraigslistJobsItem
+from craigslist_jobs.seen import load_seen, url_fingerprint
+
 # To export scraped jobs, use Scrapy's built-in feed export:
 #   uv run scrapy crawl chicago_jobs -O results.json
 # or:
 #   uv run scrapy crawl chicago_jobs -O results.csv
 # (Supported formats: JSON, CSV. See Scrapy docs for more.)
 
+# Same translator parsel uses for .css() on HTML, so the XPath is equivalent
+_css2xpath = HTMLTranslator().css_to_xpath
+
+
+def _row_xpath(css):
+    """Compile a CSS selector to an lxml XPath returning plain strings"""
+    return etree.XPath(_css2xpath(css), smart_strings=False)
+
+
+def _first(results):
+    """First result of a compiled XPath or None, like parsel's .get()"""
+    return results[0] if results else None
+
+
+# Block pages announce themselves early; only the head of a page is scanned
+_BLOCK_SCAN_BYTES = 8192
+
+# Text blocks containing these are page chrome, not the posting body
+_NAV_WORDS = ("craigslist", "navigation", "menu", "search")
+
+# Boilerplate Craigslist prepends to every posting body
+_QR_RE = re.compile(r"^QR Code Link to This Post\s*")
+
+
+def _split_arg(value):
+    """
+    Normalize a list argument to lowercased, stripped, non-empty items.
+    Accepts a comma-separated string (scrapy crawl -a) or an already split
+    sequence (passed directly when the spider is run in-process).
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    return [item.strip().lower() for item in value if item.strip()]
+
+
+def _minimal_terms(terms):
+    """
+    Reduce substring terms (keywords, locations) to the ones worth scanning
+    for: a term that contains another term can never change the outcome of
+    an "any term" match.
+    """
+    minimal = []
+    for term in sorted(set(terms), key=len):
+        if not any(shorter in term for shorter in minimal):
+            minimal.append(term)
+    return tuple(minimal)
+
 
 class ChicagoJobsSpider(scrapy.Spider):
     name = "chicago_jobs"
     allowed_domains = ["chicago.craigslist.org"]
 
+    # CSS selectors translated to XPath once, at class creation, instead of
+    # going through the css->xpath translator on every .css() call
+    _X_DETAIL_TITLE = _css2xpath("span#titletextonly::text")
+    _X_POSTING_TITLE = _css2xpath("h1.postingtitle::text")
+    _X_H1_TITLE = _css2xpath("h1::text")
+    _X_TIME = _css2xpath("time::attr(datetime)")
+    _X_POSTINGINFO_TIME = _css2xpath(".postinginfos time::attr(datetime)")
+    _X_POSTINGINFO_DATE = _css2xpath(".postinginfos .date::text")
+    _X_POSTING_BODY = _css2xpath("#postingbody")
+    _X_USERBODY_TEXT = _css2xpath(".userbody ::text")
+    _X_BODY_TEXT = _css2xpath("body ::text")
+    # Per-row queries run for every listing row, so they are also compiled
+    # once and evaluated on the row's lxml element without Selector wrapping
+    _ROW_TITLE = _row_xpath("div.title a::text")
+    _ROW_URL = _row_xpath("div.title a::attr(href)")
+    _ROW_LOCATION = _row_xpath("div.details > div.location::text")
+    _ROW_RESULT_TITLE = _row_xpath("a.result-title::text")
+    _ROW_RESULT_URL = _row_xpath("a.result-title::attr(href)")
+    _ROW_RESULT_HOOD = _row_xpath(".result-hood::text")
+    _ROW_LINK_TEXT = _row_xpath("a::text")
+    _ROW_LINK_URL = _row_xpath("a::attr(href)")
+
+    # Superset of every job row strategy (li.cl-static-search-result included)
+    _X_ROW_CANDIDATES = "//li[contains(@class, 'result') or @data-pid]"
+    # Superset of every next-page strategy (a.button.next and a.next included)
+    _X_NEXT_CANDIDATES = "//a[contains(text(), 'next') or contains(@class, 'next')]"
+
     # Scrapy will call __init__ with spider_args set by -a.
     def __init__(
         self,
@@ -21,6 +101,8 @@ class ChicagoJobsSpider(scrapy.Spider):
         section=None,
         locations=None,
         max_jobs=None,
+        seen_db=None,
+        title_prefilter=None,
         *args,
         **kwargs,
     ):
@@ -28,11 +110,11 @@ class ChicagoJobsSpider(scrapy.Spider):
 
         # Universal parameters via CLI
         if keywords is not None:
-            self.keywords = [
-                k.strip().lower() for k in keywords.split(",") if k.strip()
-            ]
+            self.keywords = _split_arg(keywords)
         else:
             self.keywords = ["smm", "video", "tiktok"]
+        # Compiled once here instead of scanning every keyword on every job
+        self._keyword_matchers = _minimal_terms(self.keywords)
 
         if days is not None:
             try:
@@ -41,18 +123,20 @@ class ChicagoJobsSpider(scrapy.Spider):
                 self.days = 7
         else:
             self.days = 7
+        # Oldest posting time still accepted, fixed once per crawl
+        self._cutoff = datetime.now() - timedelta(days=self.days)
+        self._cutoff_iso = self._cutoff.isoformat(timespec="seconds")
 
         self.section = section if section else "jjj"
 
         # Parse locations argument (new)
         if locations is not None:
-            self.locations = [
-                loc.strip().lower() for loc in locations.split(",") if loc.strip()
-            ]
+            self.locations = _split_arg(locations)
             if not self.locations:
                 self.locations = None
         else:
             self.locations = None
+        self._location_matchers = _minimal_terms(self.locations or ())
 
         # Parse max_jobs argument (new)
         try:
@@ -60,12 +144,24 @@ class ChicagoJobsSpider(scrapy.Spider):
         except Exception:
             self.max_jobs = 100
 
+        # Parse title_prefilter argument: skip detail pages of listings whose
+        # title has no keyword (faster, but misses description-only matches)
+        self.title_prefilter = str(title_prefilter).lower() in ("1", "true", "yes")
+
+        # Fingerprints of job URLs seen on previous runs (skipped before fetching)
+        self.seen_fingerprints = load_seen(seen_db) if seen_db else set()
+
         self.start_urls = [f"https://chicago.craigslist.org/search/{self.section}"]
 
         self.logger.info(
             f"Spider started with: keywords={self.keywords}, days={self.days}, section={self.section}, locations={self.locations}, max_jobs={self.max_jobs}"
         )
 
+    async def start(self):
+        # Same as the default, plus an errback to notice failed listing pages
+        for url in self.start_urls:
+            yield scrapy.Request(url, callback=self.parse, errback=self.handle_error)
+
     def parse(self, response):
         """
         Parse the main job search page, extract job listings,
@@ -75,8 +171,9 @@ class ChicagoJobsSpider(scrapy.Spider):
         Improved based on GoTrained tutorial recommendations.
         """
         # Check if we got blocked or encountered an error
-        if "blocked" in response.text.lower() or response.status != 200:
+        if self._is_blocked(response):
             self.logger.error(f"Possibly blocked or error response: {response.status}")
+            self.crawler.stats.inc_value("craigslist_jobs/blocked")
             return
 
         # Multiple selector strategies for robustness (GoTrained approach)
@@ -84,9 +181,11 @@ class ChicagoJobsSpider(scrapy.Spider):
 
         if not job_rows:
             self.logger.warning("No job rows found. Page structure may have changed.")
-            # Debug: save the page for inspection
-            with open("debug_page.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
+            # Debug: save the page for inspection. Opt-in, since it is a blocking
+            # write on the reactor thread and the HTTP cache keeps the page anyway
+            if self.settings.getbool("DEBUG_DUMP_HTML"):
+                with open("debug_page.html", "w", encoding="utf-8") as f:
+                    f.write(response.text)
             return
 
         self.logger.info(f"Found {len(job_rows)} jobs on current page.")
@@ -100,6 +199,17 @@ class ChicagoJobsSpider(scrapy.Spider):
         for job in row_iter:
             job_data = self._extract_job_basic_info(job)
             if job_data and job_data["url"]:
+                # Resolve relative links against the listing page URL; the
+                # absolute URL is also the job_url reported for the item
+                job_data["url"] = response.urljoin(job_data["url"])
+                if url_fingerprint(job_data["url"]) in self.seen_fingerprints:
+                    self.logger.debug(f"Job already seen: {job_data['url']}")
+                    continue
+                if not self._title_may_match(job_data["title"]):
+                    self.logger.debug(
+                        f"Job filtered out by title keywords: {job_data['title']}"
+                    )
+                    continue
                 yield scrapy.Request(
                     job_data["url"],
                     callback=self.parse_job_detail,
@@ -115,28 +225,53 @@ class ChicagoJobsSpider(scrapy.Spider):
                 next_page, callback=self.parse, errback=self.handle_error
             )
 
+    def _is_blocked(self, response):
+        """Error status, or a block notice near the top of the page"""
+        if response.status != 200:
+            return True
+        # Lowercase a bounded byte prefix instead of a decoded copy of the page
+        return b"blocked" in response.body[:_BLOCK_SCAN_BYTES].lower()
+
+    def _title_may_match(self, title):
+        """Title-only keyword check run before fetching a detail page"""
+        if not (self.title_prefilter and self.keywords) or title == "Unknown Job":
+            return True
+        title_lc = title.lower()
+        return any(map(title_lc.__contains__, self._keyword_matchers))
+
     def _extract_job_rows(self, response):
-        """Extract job rows using multiple selector strategies for robustness"""
+        """Extract job rows using multiple selector strategies in a single pass"""
+        # One query collects the rows of every strategy. As before, only the
+        # first strategy with matches is used, which an XPath union can't do.
+        candidates = [
+            (row, set(row.attrib.get("class", "").split()))
+            for row in response.xpath(self._X_ROW_CANDIDATES)
+        ]
+
         # Strategy 1: Modern Craigslist structure
-        job_rows = response.css("li.cl-static-search-result")
+        job_rows = [
+            row for row, classes in candidates if "cl-static-search-result" in classes
+        ]
         if job_rows:
             self.logger.debug("Using cl-static-search-result selector")
             return job_rows
 
         # Strategy 2: Alternative structure (from GoTrained tutorial)
-        job_rows = response.css("li.result-row")
+        job_rows = [row for row, classes in candidates if "result-row" in classes]
         if job_rows:
             self.logger.debug("Using result-row selector")
             return job_rows
 
         # Strategy 3: Generic list items with data-pid (backup)
-        job_rows = response.css("li[data-pid]")
+        job_rows = [row for row, _ in candidates if "data-pid" in row.attrib]
         if job_rows:
             self.logger.debug("Using data-pid selector")
             return job_rows
 
         # Strategy 4: XPath fallback
-        job_rows = response.xpath("//li[contains(@class, 'result')]")
+        job_rows = [
+            row for row, _ in candidates if "result" in row.attrib.get("class", "")
+        ]
         if job_rows:
             self.logger.debug("Using XPath result selector")
             return job_rows
@@ -145,23 +280,25 @@ class ChicagoJobsSpider(scrapy.Spider):
 
     def _extract_job_basic_info(self, job):
         """Extract basic job information using multiple selector strategies"""
+        row = job.root
+
         # Strategy 1: Modern structure - more specific selectors
-        title = job.css("div.title a::text").get()
-        url = job.css("div.title a::attr(href)").get()
-        location_raw = job.css("div.details > div.location::text").get()
+        title = _first(self._ROW_TITLE(row))
+        url = _first(self._ROW_URL(row))
+        location_raw = _first(self._ROW_LOCATION(row))
 
         # Strategy 2: Alternative structure (GoTrained tutorial style)
         if not title:
-            title = job.css("a.result-title::text").get()
+            title = _first(self._ROW_RESULT_TITLE(row))
         if not url:
-            url = job.css("a.result-title::attr(href)").get()
+            url = _first(self._ROW_RESULT_URL(row))
         if not location_raw:
-            location_raw = job.css(".result-hood::text").get()
+            location_raw = _first(self._ROW_RESULT_HOOD(row))
 
         # Strategy 3: More aggressive selectors
         if not title:
             # Get text from the first link that's not empty
-            all_links = job.css("a::text").getall()
+            all_links = self._ROW_LINK_TEXT(row)
             for link_text in all_links:
                 clean_text = link_text.strip()
                 if clean_text and len(clean_text) > 3:  # Ignore very short texts
@@ -169,7 +306,7 @@ class ChicagoJobsSpider(scrapy.Spider):
                     break
 
         if not url:
-            url = job.css("a::attr(href)").get()
+            url = _first(self._ROW_LINK_URL(row))
 
         # Clean up title
         if title:
@@ -199,10 +336,6 @@ class ChicagoJobsSpider(scrapy.Spider):
         else:
             location = location_clean
 
-        # Make URL absolute if relative
-        if url and url.startswith("/"):
-            url = "https://chicago.craigslist.org" + url
-
         # Debug logging
         self.logger.debug(f"Final: title='{title}', url='{url}', location='{location}'")
 
@@ -214,29 +347,31 @@ class ChicagoJobsSpider(scrapy.Spider):
         }
 
     def _find_next_page(self, response):
-        """Find next page using multiple selector strategies"""
-        # Strategy 1: Modern next button
-        next_page = response.css("a.button.next::attr(href)").get()
-        if next_page:
-            return next_page
-
-        # Strategy 2: Alternative next link
-        next_page = response.css("a.next::attr(href)").get()
-        if next_page:
-            return next_page
-
-        # Strategy 3: XPath approach
-        next_page = response.xpath(
-            "//a[contains(text(), 'next') or contains(@class, 'next')]/@href"
-        ).get()
-        if next_page:
-            return next_page
+        """Find next page using multiple selector strategies in a single pass"""
+        # One query collects every candidate link. The strategy priority is
+        # applied here because an XPath union would only return document order.
+        candidates = [
+            (set(link.attrib.get("class", "").split()), link.attrib["href"])
+            for link in response.xpath(self._X_NEXT_CANDIDATES)
+            if link.attrib.get("href")
+        ]
+
+        # Strategy 1: Modern next button (a.button.next)
+        # Strategy 2: Alternative next link (a.next)
+        # Strategy 3: Any link with "next" in its text or class
+        for required_classes in ({"button", "next"}, {"next"}, set()):
+            for classes, href in candidates:
+                if required_classes <= classes:
+                    return href
 
         return None
 
     def handle_error(self, failure):
         """Handle request errors gracefully"""
         self.logger.error(f"Request failed: {failure.request.url} - {failure.value}")
+        # A failed listing page loses every job on it and the pages after it
+        if failure.request.callback == self.parse:
+            self.crawler.stats.inc_value("craigslist_jobs/listing_failed")
 
     def parse_job_detail(self, response):
         """
@@ -247,15 +382,16 @@ class ChicagoJobsSpider(scrapy.Spider):
         Enhanced based on GoTrained tutorial recommendations.
         """
         # Check if we got blocked or error
-        if "blocked" in response.text.lower() or response.status != 200:
+        if self._is_blocked(response):
             self.logger.warning(f"Blocked or error on detail page: {response.url}")
+            self.crawler.stats.inc_value("craigslist_jobs/blocked")
             return
 
         # Get title from detail page (more reliable than list page)
         title = (
-            response.css("span#titletextonly::text").get()
-            or response.css("h1.postingtitle::text").get()
-            or response.css("h1::text").get()
+            response.xpath(self._X_DETAIL_TITLE).get()
+            or response.xpath(self._X_POSTING_TITLE).get()
+            or response.xpath(self._X_H1_TITLE).get()
             or response.meta["title"]
             or ""
         )
@@ -282,22 +418,27 @@ class ChicagoJobsSpider(scrapy.Spider):
         # Multiple strategies for description extraction (GoTrained approach)
         description = self._extract_description(response)
 
-        # Create short description
-        short_description = (
-            description[:200].rsplit(" ", 1)[0]
-            if len(description) > 200
-            else description
-        )
+        # Create short description, cut at the last space within 200 chars
+        if len(description) > 200:
+            cut = description.rfind(" ", 0, 200)
+            short_description = description[: cut if cut > 0 else 200]
+        else:
+            short_description = description
+
+        # Lowercase the description once for both the remote check and keywords
+        description_lc = description.lower()
 
         # Override location if "remote" appears in description
         if location not in ("remote", "N/A"):
-            if "remote" in description.lower():
+            if "remote" in description_lc:
                 location = "remote"
 
         # Keyword filtering: If self.keywords nonempty, filter; else, do not filter by keyword
-        text_to_search = f"{title} {description}".lower()
         if self.keywords:  # Only filter if there are actual keywords
-            if not any(kw in text_to_search for kw in self.keywords):
+            # Only build the search text when there is something to match
+            text_to_search = f"{title.lower()} {description_lc}"
+            # map() over the bound __contains__ keeps the whole scan in C
+            if not any(map(text_to_search.__contains__, self._keyword_matchers)):
                 self.logger.debug(f"Job filtered out by keywords: {title}")
                 return
 
@@ -310,33 +451,33 @@ class ChicagoJobsSpider(scrapy.Spider):
         # Location filtering: yield only if allowed or no locations filtering set
         if self.locations:
             location_lc = (location or "").lower()
-            if not any(allowed in location_lc for allowed in self.locations):
+            if not any(map(location_lc.__contains__, self._location_matchers)):
                 self.logger.debug(f"Job filtered out by location: {title} ({location})")
                 return
 
         self.logger.info(f"Scraped job: {title}")
-        yield {
-            "title": title,
-            "job_url": job_url,
-            "posted_date": posted_date_raw,
-            "location": location,
-            "short_description": short_description,
-        }
+        yield CraigslistJobsItem(
+            title=title,
+            job_url=job_url,
+            posted_date=posted_date_raw,
+            location=location,
+            short_description=short_description,
+        )
 
     def _extract_posted_date(self, response):
         """Extract posted date using multiple strategies"""
         # Strategy 1: Standard time element
-        posted_date = response.css("time::attr(datetime)").get()
+        posted_date = response.xpath(self._X_TIME).get()
         if posted_date:
             return posted_date
 
         # Strategy 2: Date in posting details
-        posted_date = response.css(".postinginfos time::attr(datetime)").get()
+        posted_date = response.xpath(self._X_POSTINGINFO_TIME).get()
         if posted_date:
             return posted_date
 
         # Strategy 3: Text extraction from posting info
-        date_text = response.css(".postinginfos .date::text").get()
+        date_text = response.xpath(self._X_POSTINGINFO_DATE).get()
         if date_text:
             return date_text
 
@@ -345,59 +486,58 @@ class ChicagoJobsSpider(scrapy.Spider):
     def _extract_description(self, response):
         """Extract job description using multiple strategies"""
         # Strategy 1: Modern structure
-        description = response.css("#postingbody").xpath("normalize-space()").get()
+        description = (
+            response.xpath(self._X_POSTING_BODY).xpath("normalize-space()").get()
+        )
         if description:
-            return re.sub(r"^QR Code Link to This Post\s*", "", description).strip()
+            return _QR_RE.sub("", description, count=1).strip()
 
         # Strategy 2: Alternative structure
-        description = response.css(".userbody ::text").getall()
+        description = response.xpath(self._X_USERBODY_TEXT).getall()
         if description:
             description = " ".join(description).strip()
-            return re.sub(r"^QR Code Link to This Post\s*", "", description).strip()
-
-        # Strategy 3: Generic body content
-        description = response.css("body ::text").getall()
-        if description:
-            # Filter out navigation and other non-content text
-            filtered_text = []
-            for text in description:
-                text = text.strip()
-                if (
-                    text
-                    and len(text) > 10
-                    and not any(
-                        x in text.lower()
-                        for x in ["craigslist", "navigation", "menu", "search"]
-                    )
-                ):
+            return _QR_RE.sub("", description, count=1).strip()
+
+        # Strategy 3: Generic body content. Walks every text node of the page
+        # and rarely finds a real description, so it is opt-in
+        if not self.settings.getbool("FULL_BODY_DESC_FALLBACK"):
+            return ""
+
+        # Filter out navigation and other non-content text
+        filtered_text = []
+        for text in response.xpath(self._X_BODY_TEXT).getall():
+            text = text.strip()
+            if len(text) > 10:
+                text_lc = text.lower()
+                if not any(map(text_lc.__contains__, _NAV_WORDS)):
                     filtered_text.append(text)
+                    # Limit to first 10 meaningful text blocks
+                    if len(filtered_text) == 10:
+                        break
 
-            if filtered_text:
-                return " ".join(
-                    filtered_text[:10]
-                )  # Limit to first 10 meaningful text blocks
-
-        return ""
+        return " ".join(filtered_text)
 
     def _is_job_recent(self, posted_date_raw):
         """Check if job is within the specified number of days"""
         if not posted_date_raw:
             return True  # If no date, assume it's recent
 
+        # Well-formed ISO 8601 timestamps sort lexicographically, so the common
+        # case is a plain string compare against the cutoff, without parsing
+        if len(posted_date_raw) >= 19 and posted_date_raw[10] == "T":
+            return posted_date_raw[:19] >= self._cutoff_iso
+
+        # Only the "T"-separated form is parsed, as strptime with
+        # "%Y-%m-%dT%H:%M:%S" did; other formats such as the .postinginfos .date
+        # text ("YYYY-MM-DD HH:MM") stay treated as recent
+        if "T" not in posted_date_raw:
+            self.logger.warning(f"Date parsing error: {posted_date_raw!r}")
+            return True
+
         try:
-            if posted_date_raw:
-                job_post_dt = datetime.strptime(
-                    posted_date_raw[:19], "%Y-%m-%dT%H:%M:%S"
-                )
-                now_dt = (
-                    datetime.now(job_post_dt.tzinfo)
-                    if job_post_dt.tzinfo
-                    else datetime.now()
-                )
-                cutoff = now_dt - timedelta(days=self.days)
-                return job_post_dt >= cutoff
+            # Local time without offset: the first 19 chars of the ISO 8601 value
+            job_post_dt = datetime.fromisoformat(posted_date_raw[:19])
+            return job_post_dt >= self._cutoff
         except Exception as e:
             self.logger.warning(f"Date parsing error: {e}")
             return True  # If can't parse date, assume it's recent
-
-        return True
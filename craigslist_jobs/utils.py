@@ -0,0 +1,29 @@
+# Small helpers shared by the spider and azalia_search.py
+
+import os
+import tempfile
+
+
+def atomic_write(path, mode, write_fn, **open_kwargs):
+    """
+    Call write_fn(f) on a new temp file next to path, then move it into place.
+    The temp file is uniquely named, so concurrent runs never write the same
+    one, and it is removed if writing fails.
+    """
+    tmp = tempfile.NamedTemporaryFile(
+        mode,
+        dir=os.path.dirname(os.path.abspath(path)),
+        suffix=".tmp",
+        delete=False,
+        **open_kwargs,
+    )
+    try:
+        with tmp:
+            write_fn(tmp)
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except FileNotFoundError:
+            pass
+        raise